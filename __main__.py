@@ -9,8 +9,28 @@ import pulumi
 import pulumi_linode as linode
 import pulumi_kubernetes as k8s
 import base64
+import glob
+import os
 import yaml
 import pulumiverse_time as time
+from packaging.version import InvalidVersion, Version
+
+# Use the libyaml C loader when PyYAML was built with it (yaml.__with_libyaml__),
+# otherwise fall back to the pure-Python safe loader
+try:
+  from yaml import CSafeLoader
+except ImportError:
+  from yaml import SafeLoader as CSafeLoader
+
+def _yload(s):
+    return yaml.load(s, Loader=CSafeLoader)
+
+def _yload_files(paths):
+    objs = []
+    for path in paths:
+      with open(path) as f:
+        objs.extend(obj for obj in yaml.load_all(f, Loader=CSafeLoader) if obj)
+    return objs
 
 # Configuration section
 # Read and set default values for cluster configuration including node types,
@@ -19,11 +39,23 @@ config = pulumi.Config()
 lke_controller_node_type = config.get("lke_controller_node_type") or "g6-standard-1"
 lke_controller_node_count = config.get_int("lke_controller_node_count") or 3
 lke_version = config.get("lke_version") or "1.32"
-region_lke_controller = config.require("region_lke_controller")
-worker_clusters = config.require_object("worker_clusters")
+
+# Stack layout
+# "all" deploys the controller and the worker clusters in a single stack.
+# "controller" and "workers" split them into two stacks, the workers stack reads
+# the controller kubeconfig from the stack set in controller_stack
+stack_role = config.get("stack_role") or "all"
+if stack_role not in ("all", "controller", "workers"):
+  raise ValueError(f"stack_role must be one of all, controller or workers, got {stack_role}")
+deploy_controller = stack_role in ("all", "controller")
+deploy_workers = stack_role in ("all", "workers")
+
+region_lke_controller = config.require("region_lke_controller") if deploy_controller else config.get("region_lke_controller")
+worker_clusters = config.require_object("worker_clusters") if deploy_workers else {}
 project_name = "bookinfo-project"
 namespaced_project_name = "kubeslice-bookinfo-project"
 application_namespace="bookinfo"
+helm_charts_dir = config.get("helm_charts_dir") or "./charts"
 
 # Enterprise version configuration
 # Check if enterprise version is enabled and set appropriate helm repository and version
@@ -34,34 +66,126 @@ if enterprise_enabled == True:
   enterprise_username=kubeslice_enterprise.get("username")
   enterprise_password=kubeslice_enterprise.get("password")
   enterprise_email=kubeslice_enterprise.get("email")
+  enterprise_image_pull_secrets = {
+      "username": enterprise_username,
+      "password": enterprise_password,
+      "email": enterprise_email
+  }
   helm_repository_kubeslice="https://kubeslice.aveshalabs.io/repository/kubeslice-helm-ent-prod/"
   helm_chart_version="1.15.0"
 else:
   helm_repository_kubeslice="https://kubeslice.github.io/kubeslice/"
   helm_chart_version="1.3.1"
 
+# Index the worker clusters configuration once, with defaults for the optional
+# application flags
+worker_cfg = {
+    cluster_name: {
+        "region": cluster_config["region"],
+        "worker_node_type": cluster_config["worker_node_type"],
+        "worker_node_count": cluster_config["worker_node_count"],
+        "gw_node_type": cluster_config["gw_node_type"],
+        "gw_node_count": cluster_config["gw_node_count"],
+        "frontend": cluster_config.get("application_frontend", False),
+        "backend": cluster_config.get("application_backend", False),
+    }
+    for cluster_name, cluster_config in worker_clusters.items()
+}
+worker_cluster_names = [f"kubeslice-{cluster_name}" for cluster_name in worker_cfg]
+
+# Helm repository options shared by every release
+kubeslice_repository_opts = k8s.helm.v3.RepositoryOptsArgs(repo=helm_repository_kubeslice)
+
+# Chart arguments for a helm release
+# Use a chart tarball pre-pulled into the edition directory of helm_charts_dir
+# (helm pull <chart> --version <version> -d ./charts/<community|enterprise>)
+# when present, otherwise fetch the chart from the helm repository
+helm_charts_edition_dir = os.path.join(helm_charts_dir, "enterprise" if enterprise_enabled else "community")
+
+def _local_chart_version(chart, path):
+    try:
+      return Version(os.path.basename(path)[len(chart) + 1:-len(".tgz")])
+    except InvalidVersion:
+      return None
+
+def helm_chart(chart, version=None):
+    if version:
+      local_chart = os.path.join(helm_charts_edition_dir, f"{chart}-{version}.tgz")
+      if os.path.exists(local_chart):
+        return {"chart": local_chart}
+    else:
+      # Unversioned charts use the highest version pulled for that chart
+      local_charts = {}
+      for path in glob.glob(os.path.join(helm_charts_edition_dir, f"{chart}-[0-9]*.tgz")):
+        local_version = _local_chart_version(chart, path)
+        if local_version:
+          local_charts[local_version] = path
+      if local_charts:
+        return {"chart": local_charts[max(local_charts)]}
+    return {"chart": chart, "repository_opts": kubeslice_repository_opts, "version": version}
+
+# The KubeSlice custom resources used to be children of a yaml/v2 ConfigGroup
+# with the same name. Alias them to their previous URNs, so existing stacks adopt
+# the live objects instead of creating new resources and deleting the old ones
+def config_group_child_alias(group, namespace, name):
+    return pulumi.Alias(
+        name=f"{group}:{namespace}/{name}",
+        parent=pulumi.create_urn(group, "kubernetes:yaml/v2:ConfigGroup"))
+
 ###############################################################################
 # Controller Cluster Setup
 ###############################################################################
 
-# Create the KubeSlice controller LKE cluster
-# This cluster will manage the worker clusters and slice configurations
-controller_cluster = linode.LkeCluster(
-    "kubeslice-controller",
-    label="kubeslice-controller",
-    k8s_version=lke_version,
-    region=region_lke_controller,
-    tags=["app:kubeslice-controller"],
-    pools=[linode.LkeClusterPoolArgs(
-        type=lke_controller_node_type,
-        count=lke_controller_node_count,
-    )]
-)
-
-# Decode the kubeconfig for the controller cluster
-controller_kubeconfig = controller_cluster.kubeconfig.apply(
-    lambda k: base64.b64decode(k).decode("utf-8")
-)
+# LKE clusters take many minutes to replace, so they are protected against
+# deletion and tag or version changes do not update existing clusters.
+# Timeouts leave room for Linode API rate limit backoff
+lke_cluster_ignore_changes = ["tags", "k8s_version"]
+lke_cluster_timeouts = pulumi.CustomTimeouts(create="20m", update="20m")
+
+if deploy_controller:
+  # Create the KubeSlice controller LKE cluster
+  # This cluster will manage the worker clusters and slice configurations
+  controller_cluster = linode.LkeCluster(
+      "kubeslice-controller",
+      label="kubeslice-controller",
+      k8s_version=lke_version,
+      region=region_lke_controller,
+      tags=["app:kubeslice-controller"],
+      pools=[linode.LkeClusterPoolArgs(
+          type=lke_controller_node_type,
+          count=lke_controller_node_count,
+      )],
+      opts=pulumi.ResourceOptions(
+          protect=True,
+          ignore_changes=lke_cluster_ignore_changes,
+          custom_timeouts=lke_cluster_timeouts)
+  )
+
+  # Decode the kubeconfig for the controller cluster
+  controller_kubeconfig = controller_cluster.kubeconfig.apply(
+      lambda k: base64.b64decode(k).decode("utf-8")
+  )
+  project_namespace = namespaced_project_name
+else:
+  # Read the controller kubeconfig and project namespace exported by the
+  # controller stack
+  controller_stack_reference = pulumi.StackReference(config.require("controller_stack"))
+  controller_kubeconfig = controller_stack_reference.require_output("kubeconfig")
+  project_namespace = controller_stack_reference.require_output("project_namespace")
+
+# Parse the controller kubeconfig once and extract the fields needed by the
+# controller and worker helm values
+controller_kubeconfig_parsed = controller_kubeconfig.apply(_yload)
+controller_endpoint = controller_kubeconfig_parsed.apply(lambda d: d["clusters"][0]["cluster"]["server"])
+controller_ca = controller_kubeconfig_parsed.apply(lambda d: d["clusters"][0]["cluster"]["certificate-authority-data"])
+controller_token = controller_kubeconfig_parsed.apply(lambda d: d["users"][0]["user"]["token"])
+
+# Base64 encode the project namespace, controller endpoint and token once for
+# all worker secrets
+if deploy_workers:
+  project_namespace_b64 = pulumi.Output.from_input(project_namespace).apply(lambda s: base64.b64encode(s.encode()).decode())
+  controller_endpoint_b64 = controller_endpoint.apply(lambda s: base64.b64encode(s.encode()).decode())
+  controller_token_b64 = controller_token.apply(lambda s: base64.b64encode(s.encode()).decode())
 
 # Create a Kubernetes provider for the controller cluster
 controller_provider = k8s.Provider(
@@ -75,110 +199,103 @@ controller_provider = k8s.Provider(
 ###############################################################################
 
 # Prepare values for KubeSlice controller installation
-# Different configurations for enterprise and community editions
-if enterprise_enabled:
-  kubeslice_controller_values = controller_kubeconfig.apply(lambda kubeconfig: {
-      "kubeslice": {
-          "controller": {
-              "endpoint": yaml.safe_load(kubeconfig)["clusters"][0]["cluster"]["server"]
-          },
-          "license": {
-             "type": "kubeslice-trial-license",
-             "mode": "auto",
-             "customerName": enterprise_email
-          }          
-      },
-      "imagePullSecrets": {
-             "username": enterprise_username,
-             "password": enterprise_password,
-             "email": enterprise_email
-          }
-  })
-
-  kubeslice_ui_values = {
-      "imagePullSecrets": {
-            "username": enterprise_username,
-            "password": enterprise_password,
-            "email": enterprise_email
-          }
-  }
-else:
-  kubeslice_controller_values = controller_kubeconfig.apply(lambda kubeconfig: {
-      "kubeslice": {
-          "controller": {
-              "endpoint": yaml.safe_load(kubeconfig)["clusters"][0]["cluster"]["server"]
-          }
+# Enterprise edition adds the license and image pull secrets
+def build_controller_values():
+    values = {
+        "kubeslice": {
+            "controller": {
+                "endpoint": controller_endpoint
+            }
+        }
+    }
+    if enterprise_enabled:
+      values["kubeslice"]["license"] = {
+          "type": "kubeslice-trial-license",
+          "mode": "auto",
+          "customerName": enterprise_email
       }
-  })
-
-#Create kubeslice-controller namespace
-namespace_kubeslice_controller = k8s.core.v1.Namespace(
-    "kubeslice-controller",
-    metadata={
-        "name": "kubeslice-controller",
-    },
-    opts=pulumi.ResourceOptions(provider=controller_provider)
-)
+      values["imagePullSecrets"] = enterprise_image_pull_secrets
+    return values
+
+# KubeSlice releases are not reconciled after install: values, values files and
+# chart version changes are ignored, the same way for the controller, UI and
+# worker releases
+helm_release_ignore_changes = ["values", "value_yaml_files", "version"]
+
+if deploy_controller:
+  kubeslice_controller_values = pulumi.Output.from_input(build_controller_values())
+
+  #Create kubeslice-controller namespace
+  namespace_kubeslice_controller = k8s.core.v1.Namespace(
+      "kubeslice-controller",
+      metadata={
+          "name": "kubeslice-controller",
+      },
+      opts=pulumi.ResourceOptions(provider=controller_provider)
+  )
 
-# Install kubeslice-controller
-kubeslice_controller_release = k8s.helm.v3.Release("kubeslice-controller",
-    chart="kubeslice-controller",
-    namespace="kubeslice-controller",
-    repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-        repo=helm_repository_kubeslice,
-    ),
-    version=helm_chart_version,
-    values=kubeslice_controller_values,
-    skip_await=False,
-    opts=pulumi.ResourceOptions(
-        provider=controller_provider,
-        depends_on=[namespace_kubeslice_controller],
-        ignore_changes=["*"]))
-
-# Install kubeslice-controller if enterprise enabled
-if enterprise_enabled:
-  kubeslice_ui_release = k8s.helm.v3.Release("kubeslice-ui",
-      chart="kubeslice-ui",
+  # Install kubeslice-controller
+  kubeslice_controller_release = k8s.helm.v3.Release("kubeslice-controller",
+      **helm_chart("kubeslice-controller", helm_chart_version),
       namespace="kubeslice-controller",
-      repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-          repo=helm_repository_kubeslice,
-      ),
-      version=helm_chart_version,
-      values=kubeslice_ui_values,
+      values=kubeslice_controller_values,
       skip_await=False,
       opts=pulumi.ResourceOptions(
           provider=controller_provider,
           depends_on=[namespace_kubeslice_controller],
-          ignore_changes=["*"]))
-
-# Introduce a 30-second delay
-wait30_seconds = time.Sleep("wait30Seconds", create_duration="30s", opts = pulumi.ResourceOptions(depends_on=[kubeslice_controller_release]))
-
-
-#Create kubeslice controller project
-kubeslice_project_raw_yaml=f"""
-apiVersion: controller.kubeslice.io/v1alpha1
-kind: Project
-metadata:
-  name: {project_name}
-  namespace: kubeslice-controller
-spec:
-  serviceAccount:
-    readOnly:
-    - readonly-user1
-    - readonly-user2
-    readWrite:
-    - readwrite-user1
-    - readwrite-user2
-"""
-
-kubeslice_project =k8s.yaml.v2.ConfigGroup(
-    "kubeslice-project",
-    objs=[yaml.safe_load(kubeslice_project_raw_yaml)],
-    opts=pulumi.ResourceOptions(
-        provider=controller_provider,
-        depends_on=[kubeslice_controller_release, wait30_seconds])
-)
+          ignore_changes=helm_release_ignore_changes))
+
+  # Install kubeslice-controller if enterprise enabled
+  if enterprise_enabled:
+    kubeslice_ui_values = {
+        "imagePullSecrets": enterprise_image_pull_secrets
+    }
+
+    kubeslice_ui_release = k8s.helm.v3.Release("kubeslice-ui",
+        **helm_chart("kubeslice-ui", helm_chart_version),
+        namespace="kubeslice-controller",
+        values=kubeslice_ui_values,
+        # Nothing depends on the UI, let it become ready in the background
+        skip_await=True,
+        opts=pulumi.ResourceOptions(
+            provider=controller_provider,
+            depends_on=[namespace_kubeslice_controller],
+            ignore_changes=helm_release_ignore_changes))
+
+  #Create kubeslice controller project
+  # No delay needed after the controller install: the release is awaited
+  # (skip_await=False) so the controller CRDs and webhook are ready
+  kubeslice_project = k8s.apiextensions.CustomResource(
+      "kubeslice-project",
+      api_version="controller.kubeslice.io/v1alpha1",
+      kind="Project",
+      metadata={
+          "name": project_name,
+          "namespace": "kubeslice-controller",
+      },
+      spec={
+          "serviceAccount": {
+              "readOnly": ["readonly-user1", "readonly-user2"],
+              "readWrite": ["readwrite-user1", "readwrite-user2"],
+          }
+      },
+      opts=pulumi.ResourceOptions(
+          provider=controller_provider,
+          depends_on=[kubeslice_controller_release],
+          aliases=[config_group_child_alias("kubeslice-project", "kubeslice-controller", project_name)])
+  )
+
+  # Registrations are created in the project namespace, which the controller
+  # creates once it reconciles the project. No delay is needed: the Kubernetes
+  # provider retries creation with backoff while the namespace is not found
+  project_ready = [kubeslice_project]
+
+  # Export the controller outputs read by a separate workers stack
+  pulumi.export("kubeconfig", pulumi.Output.secret(controller_kubeconfig))
+  pulumi.export("project_namespace", namespaced_project_name)
+else:
+  # The project is managed and awaited by the controller stack
+  project_ready = []
 
 
 ###############################################################################
@@ -186,10 +303,11 @@ kubeslice_project =k8s.yaml.v2.ConfigGroup(
 ###############################################################################
 
 # Create worker clusters based on configuration
-worker_clusters_resources = {}
 worker_providers = {}
+worker_parsed = {}
+worker_endpoints = {}
 
-for cluster_name, cluster_config in worker_clusters.items():
+for cluster_name, cluster_config in worker_cfg.items():
     worker_cluster = linode.LkeCluster(
         f"kubeslice-{cluster_name}",
         label=f"kubeslice-{cluster_name}",
@@ -211,15 +329,22 @@ for cluster_name, cluster_config in worker_clusters.items():
                 count=cluster_config["gw_node_count"],
                 labels={"kubeslice.io/node-type": "gateway"},
             ),
-        ]
+        ],
+        opts=pulumi.ResourceOptions(
+            protect=True,
+            ignore_changes=lke_cluster_ignore_changes,
+            custom_timeouts=lke_cluster_timeouts)
     )
-    worker_clusters_resources[cluster_name] = worker_cluster
 
     # Decode the kubeconfig for the worker cluster
     worker_kubeconfig = worker_cluster.kubeconfig.apply(
         lambda k: base64.b64decode(k).decode("utf-8")
     )
 
+    # Parse the decoded worker kubeconfig once for the worker helm values
+    worker_parsed[cluster_name] = worker_kubeconfig.apply(_yload)
+    worker_endpoints[cluster_name] = worker_parsed[cluster_name].apply(lambda d: d["clusters"][0]["cluster"]["server"])
+
     # Create a Kubernetes provider for the worker cluster
     worker_provider = k8s.Provider(
         f"worker-provider-{cluster_name}",
@@ -232,6 +357,31 @@ for cluster_name, cluster_config in worker_clusters.items():
 # Worker Cluster Resource Creation
 ###############################################################################
 
+# Values for the KubeSlice worker helm release
+# Constant values are read from the helm-values files, only the cluster specific
+# values are built here. Enterprise edition adds its own constant values file and
+# the image pull secrets
+worker_constant_values_files = ["./helm-values/worker-constants.yaml"]
+if enterprise_enabled:
+  worker_constant_values_files.append("./helm-values/worker-constants-enterprise.yaml")
+
+def build_worker_values(cluster_name, worker_endpoint):
+    values = {
+        "controllerSecret": {
+            "namespace": project_namespace_b64,
+            "endpoint": controller_endpoint_b64,
+            "ca.crt": controller_ca,
+            "token": controller_token_b64,
+        },
+        "cluster": {
+            "name": f"kubeslice-{cluster_name}",
+            "endpoint": worker_endpoint,
+        }
+    }
+    if enterprise_enabled:
+      values["imagePullSecrets"] = enterprise_image_pull_secrets
+    return values
+
 # Helm releases and Kubernetes resources for worker clusters
 def create_resources_for_worker(cluster_name, worker_provider):
     # Install required components:
@@ -242,10 +392,7 @@ def create_resources_for_worker(cluster_name, worker_provider):
     # Install Istio
     istio_base_release = k8s.helm.v3.Release(
         f"istio-base-{cluster_name}",
-        chart="istio-base",
-        repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-            repo=helm_repository_kubeslice
-        ),
+        **helm_chart("istio-base"),
         namespace="istio-system",
         create_namespace=True,
         opts=pulumi.ResourceOptions(provider=worker_provider)
@@ -253,10 +400,7 @@ def create_resources_for_worker(cluster_name, worker_provider):
 
     istio_d_release = k8s.helm.v3.Release(
         f"istio-d-{cluster_name}",
-        chart="istio-discovery",
-        repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-            repo=helm_repository_kubeslice
-        ),
+        **helm_chart("istio-discovery"),
         namespace="istio-system",
         opts=pulumi.ResourceOptions(
             provider=worker_provider,
@@ -268,88 +412,39 @@ def create_resources_for_worker(cluster_name, worker_provider):
     if enterprise_enabled:
       prometehus_release = k8s.helm.v3.Release(
         f"prometheus-{cluster_name}",
-        chart="prometheus",
-        repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-            repo=helm_repository_kubeslice
-        ),
+        **helm_chart("prometheus"),
         namespace="monitoring",
         create_namespace=True,
         opts=pulumi.ResourceOptions(provider=worker_provider)
       )
 
     # Kubeslice Worker HelmRelease
-    if enterprise_enabled:
-       kubeslice_worker_values = pulumi.Output.all(
-          controller_kubeconfig,
-          worker_clusters_resources[cluster_name].kubeconfig
-        ).apply(lambda args: {
-            "controllerSecret": {
-                "namespace": base64.b64encode(namespaced_project_name.encode()).decode(),
-                "endpoint": base64.b64encode(yaml.safe_load(args[0])["clusters"][0]["cluster"]["server"].encode()).decode(),
-                "ca.crt": yaml.safe_load(args[0])["clusters"][0]["cluster"]["certificate-authority-data"],
-                "token": base64.b64encode(yaml.safe_load(args[0])["users"][0]["user"]["token"].encode()).decode(),
-            },
-            "cluster": {
-                "name": f"kubeslice-{cluster_name}",  # Correctly capture the current cluster_name
-                "endpoint": yaml.safe_load(base64.b64decode(args[1]).decode())["clusters"][0]["cluster"]["server"],
-            },
-            "netop": {
-                "networkInterface": "eth0",
-            },
-            "imagePullSecrets": {
-                "username": enterprise_username,
-                "password": enterprise_password,
-                "email": enterprise_email
-              },
-            "kubesliceNetworking": {
-                "enabled": True,
-            },
-            "metrics": {
-                "insecure": True,
-            }
-        })
-       
-    else:
-      kubeslice_worker_values = pulumi.Output.all(
-          controller_kubeconfig,
-          worker_clusters_resources[cluster_name].kubeconfig
-        ).apply(lambda args: {
-            "controllerSecret": {
-                "namespace": base64.b64encode(namespaced_project_name.encode()).decode(),
-                "endpoint": base64.b64encode(yaml.safe_load(args[0])["clusters"][0]["cluster"]["server"].encode()).decode(),
-                "ca.crt": yaml.safe_load(args[0])["clusters"][0]["cluster"]["certificate-authority-data"],
-                "token": base64.b64encode(yaml.safe_load(args[0])["users"][0]["user"]["token"].encode()).decode(),
-            },
-            "cluster": {
-                "name": f"kubeslice-{cluster_name}",  # Correctly capture the current cluster_name
-                "endpoint": yaml.safe_load(base64.b64decode(args[1]).decode())["clusters"][0]["cluster"]["server"],
-            },
-            "netop": {
-                "networkInterface": "eth0",
-            }
-        })
+    kubeslice_worker_values = pulumi.Output.from_input(
+        build_worker_values(cluster_name, worker_endpoints[cluster_name])
+    )
 
     kubeslice_worker_release=k8s.helm.v3.Release(
         f"kubeslice-{cluster_name}",
-        chart="kubeslice-worker",
-        repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-            repo=helm_repository_kubeslice
-        ),
-        version=helm_chart_version,
+        **helm_chart("kubeslice-worker", helm_chart_version),
         namespace="kubeslice-system",
+        value_yaml_files=[pulumi.FileAsset(f) for f in worker_constant_values_files],
         values=kubeslice_worker_values,
         create_namespace=True,
         opts=pulumi.ResourceOptions(
             provider=worker_provider,
-            depends_on=[istio_d_release]
+            depends_on=[istio_d_release],
+            ignore_changes=helm_release_ignore_changes
         )
     )
 
     return kubeslice_worker_release
 
 # Loop through worker clusters and create resources
+# Each worker release only depends on resources of its own cluster, so Pulumi
+# installs the worker clusters in parallel
+worker_releases = {}
 for cluster_name, worker_provider in worker_providers.items():
-    kubeslice_worker_release=create_resources_for_worker(cluster_name, worker_provider)
+    worker_releases[cluster_name] = create_resources_for_worker(cluster_name, worker_provider)
 
 
 ###############################################################################
@@ -357,32 +452,32 @@ for cluster_name, worker_provider in worker_providers.items():
 ###############################################################################
 cluster_registration_status=[]
 
-for cluster_name in worker_clusters.keys():
-
-    # Introduce a 15-second delay
-    wait15_seconds_project = time.Sleep(f"wait15Seconds_project_{cluster_name}", create_duration="15s", opts = pulumi.ResourceOptions(depends_on=[kubeslice_project]))
-    
-    worker_cluster_registration_raw_yaml=f"""
-    apiVersion: controller.kubeslice.io/v1alpha1
-    kind: Cluster
-    metadata:
-      name: kubeslice-{cluster_name}
-      namespace: {namespaced_project_name}
-      annotations:
-        pulumi.com/waitFor: "jsonpath={{.status.clusterHealth.clusterHealthStatus}}=Normal"
-    spec:
-      networkInterface: eth0
-      clusterProperty:
-        geoLocation:
-          cloudProvider: "linode"
-          cloudRegion: "{worker_clusters[cluster_name]['region']}"
-    """
-    worker_cluster_registration=k8s.yaml.v2.ConfigGroup(
+for cluster_name in worker_cfg:
+
+    worker_cluster_registration = k8s.apiextensions.CustomResource(
         f"registration-{cluster_name}",
-        yaml=worker_cluster_registration_raw_yaml,
+        api_version="controller.kubeslice.io/v1alpha1",
+        kind="Cluster",
+        metadata={
+            "name": f"kubeslice-{cluster_name}",
+            "namespace": project_namespace,
+            "annotations": {
+                "pulumi.com/waitFor": "jsonpath={.status.clusterHealth.clusterHealthStatus}=Normal"
+            }
+        },
+        spec={
+            "networkInterface": "eth0",
+            "clusterProperty": {
+                "geoLocation": {
+                    "cloudProvider": "linode",
+                    "cloudRegion": worker_cfg[cluster_name]["region"],
+                }
+            }
+        },
         opts=pulumi.ResourceOptions(
             provider=controller_provider,
-            depends_on=[kubeslice_project, wait15_seconds_project])
+            depends_on=project_ready,
+            aliases=[config_group_child_alias(f"registration-{cluster_name}", namespaced_project_name, f"kubeslice-{cluster_name}")])
     )
 
     cluster_registration_status.append(worker_cluster_registration)
@@ -392,67 +487,83 @@ for cluster_name in worker_clusters.keys():
 # Create slice_config for all registered clusters
 ###############################################################################
 
-def create_slice_config(namespaced_project_name , application_namespace, worker_clusters):
-
-    cluster_names = [f"kubeslice-{cluster_name}" for cluster_name in worker_clusters.keys()]
-    # Correctly format the cluster names as a YAML list of strings
-    indented_clusters = "\n".join([f"  - {cluster}" for cluster in cluster_names])
-
-    slice_config_raw_yaml=f"""
-apiVersion: controller.kubeslice.io/v1alpha1
-kind: SliceConfig
-metadata:
-  name: slice-{application_namespace}
-  namespace: {namespaced_project_name}
-spec:
-  sliceSubnet: 10.11.0.0/16
-  maxClusters: 10
-  sliceType: Application
-  sliceGatewayProvider:
-    sliceGatewayType: OpenVPN
-    sliceCaType: Local
-  sliceIpamType: Local
-  clusters:
-{indented_clusters}
-  qosProfileDetails:
-    queueType: HTB
-    priority: 1
-    tcType: BANDWIDTH_CONTROL
-    bandwidthCeilingKbps: 5120
-    bandwidthGuaranteedKbps: 2560
-    dscpClass: AF11
-  namespaceIsolationProfile:
-    applicationNamespaces:
-    - namespace: {application_namespace}
-      clusters:
-      - '*'
-    isolationEnabled: false
-    """
-
-    return slice_config_raw_yaml
-
-
-slice_config = create_slice_config(namespaced_project_name, application_namespace, worker_clusters)
-
-kubeslice_slice_config =k8s.yaml.v2.ConfigGroup(
-    "kubeslice-slice-config",
-    objs=[yaml.safe_load(slice_config)],
-    opts=pulumi.ResourceOptions(
-        provider=controller_provider,
-        depends_on=[*cluster_registration_status, kubeslice_worker_release])
-)
+def create_slice_config(namespaced_project_name , application_namespace, cluster_names):
+
+    slice_config_manifest = {
+        "apiVersion": "controller.kubeslice.io/v1alpha1",
+        "kind": "SliceConfig",
+        "metadata": {
+            "name": f"slice-{application_namespace}",
+            "namespace": namespaced_project_name,
+        },
+        "spec": {
+            "sliceSubnet": "10.11.0.0/16",
+            "maxClusters": 10,
+            "sliceType": "Application",
+            "sliceGatewayProvider": {
+                "sliceGatewayType": "OpenVPN",
+                "sliceCaType": "Local",
+            },
+            "sliceIpamType": "Local",
+            "clusters": cluster_names,
+            "qosProfileDetails": {
+                "queueType": "HTB",
+                "priority": 1,
+                "tcType": "BANDWIDTH_CONTROL",
+                "bandwidthCeilingKbps": 5120,
+                "bandwidthGuaranteedKbps": 2560,
+                "dscpClass": "AF11",
+            },
+            "namespaceIsolationProfile": {
+                "applicationNamespaces": [
+                    {
+                        "namespace": application_namespace,
+                        "clusters": ["*"],
+                    }
+                ],
+                "isolationEnabled": False,
+            }
+        }
+    }
+
+    return slice_config_manifest
+
+
+if deploy_workers:
+  slice_config = create_slice_config(project_namespace, application_namespace, worker_cluster_names)
+
+  kubeslice_slice_config = k8s.apiextensions.CustomResource(
+      "kubeslice-slice-config",
+      api_version=slice_config["apiVersion"],
+      kind=slice_config["kind"],
+      metadata=slice_config["metadata"],
+      spec=slice_config["spec"],
+      opts=pulumi.ResourceOptions(
+          provider=controller_provider,
+          depends_on=[*cluster_registration_status, *worker_releases.values()],
+          aliases=[config_group_child_alias("kubeslice-slice-config", namespaced_project_name, f"slice-{application_namespace}")])
+  )
+
+  # Introduce a single 30-second delay shared by all worker clusters to wait for
+  # namespace kubeslice labels to inject the sidecars
+  wait30_seconds_sidecars = time.Sleep("wait30Seconds_sidecars", create_duration="30s", opts = pulumi.ResourceOptions(depends_on=[kubeslice_slice_config]))
 
 ###############################################################################
 # Application Deployment
 ###############################################################################
 
+# Bookinfo manifests, parsed once and shared by every worker cluster
+if deploy_workers:
+  bookinfo_frontend_objs = _yload_files(["./bookinfo-app/productpage.yaml"])
+  bookinfo_backend_objs = _yload_files(["./bookinfo-app/ratings.yaml","./bookinfo-app/details.yaml","./bookinfo-app/reviews.yaml","./bookinfo-app/servicesexport-details.yaml","./bookinfo-app/servicesexport-reviews.yaml"])
+
 # Deploy YAML manifests based on application_frontend and application_backend flags
-def deploy_application(worker_provider, application_namespace, cluster_name):
+def deploy_application(worker_provider, worker_release, application_namespace, cluster_name):
     resources = []
 
-    cluster_config = worker_clusters.get(cluster_name, {})
-    frontend_enabled = cluster_config.get("application_frontend", False)
-    backend_enabled = cluster_config.get("application_backend", False)
+    cluster_config = worker_cfg[cluster_name]
+    frontend_enabled = cluster_config["frontend"]
+    backend_enabled = cluster_config["backend"]
 
     #Create application namespace with istio enabled
     if frontend_enabled or backend_enabled:
@@ -467,26 +578,23 @@ def deploy_application(worker_provider, application_namespace, cluster_name):
           opts=pulumi.ResourceOptions(provider=worker_provider)
       )
 
-    # Introduce a 30-second delay to wait for namespace kubeslice labels to inject the sidecards
-    wait30_seconds_sidecars = time.Sleep(f"wait30Seconds_sidecars_{cluster_name}", create_duration="30s", opts = pulumi.ResourceOptions(depends_on=[kubeslice_slice_config]))
-
     if frontend_enabled:
         frontend_manifest = k8s.yaml.v2.ConfigGroup(
             f"frontend-manifest-{cluster_name}-{application_namespace}",
-            files=["./bookinfo-app/productpage.yaml"],
+            objs=bookinfo_frontend_objs,
             opts=pulumi.ResourceOptions(
                 provider=worker_provider,
-                depends_on=[kubeslice_slice_config, kubeslice_worker_release, wait30_seconds_sidecars])
+                depends_on=[kubeslice_slice_config, worker_release, wait30_seconds_sidecars])
         )
         resources.append(frontend_manifest)
 
     if backend_enabled:
         backend_manifest = k8s.yaml.v2.ConfigGroup(
             f"backend-manifest-{cluster_name}-{application_namespace}",
-            files=["./bookinfo-app/ratings.yaml","./bookinfo-app/details.yaml","./bookinfo-app/reviews.yaml","./bookinfo-app/servicesexport-details.yaml","./bookinfo-app/servicesexport-reviews.yaml"],
+            objs=bookinfo_backend_objs,
             opts=pulumi.ResourceOptions(
                 provider=worker_provider,
-                depends_on=[kubeslice_slice_config, kubeslice_worker_release, wait30_seconds_sidecars]
+                depends_on=[kubeslice_slice_config, worker_release, wait30_seconds_sidecars]
             )
         )
         resources.append(backend_manifest)
@@ -495,4 +603,4 @@ def deploy_application(worker_provider, application_namespace, cluster_name):
 
 # Loop through worker clusters and create resources
 for cluster_name, worker_provider in worker_providers.items():
-    deploy_application(worker_provider, application_namespace, cluster_name)
+    deploy_application(worker_provider, worker_releases[cluster_name], application_namespace, cluster_name)